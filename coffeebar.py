@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+import logging
+import signal
+import sys
+import time
+from typing import Optional
+import gpio_backend as gpio
+from gpio_config import PINS
+
+logger = logging.getLogger(__name__)
+
+LOW_FILL_PIN = PINS["LOW_FILL_SENSOR"]["pin"]
+HIGH_FILL_PIN = PINS["HIGH_FILL_SENSOR"]["pin"]
+ESPRESSO_PUMP_PIN = PINS["ESPRESSO_PUMP_RELAY"]["pin"]
+PULSE_PUMP_BTN_PIN = PINS["PULSE_PUMP_BTN"]["pin"]
+
+DEFAULT_BOUNCETIME_MS = 50
+
+class Device:
+    """An output device driven through a relay (e.g. the espresso pump)."""
+    def __init__(self, name: str, pin_number: int, active_high: bool = True):
+        self.name = name
+        self.pin_number = pin_number
+        self.active_high = active_high
+        self._last: Optional[bool] = None
+
+    def set_state(self, state: bool):
+        # Elide the write (and the syscall behind it) if the device is
+        # already in the requested state.
+        if state == self._last:
+            return
+        self._last = state
+        level = gpio.HIGH if (state == self.active_high) else gpio.LOW
+        gpio.write(self.pin_number, level)
+        logger.info(f"[STATE] {self.name} (GPIO {self.pin_number}) -> {'ON' if state else 'OFF'}")
+
+class Sensor:
+    """An input sensor wired active-low (pull-up, shorts to GND when wet)."""
+    def __init__(self, name: str, pin_number: int, active_low: bool = True,
+                 bouncetime_ms: int = DEFAULT_BOUNCETIME_MS):
+        self.name = name
+        self.pin_number = pin_number
+        self.active_low = active_low
+        self.bouncetime_ms = bouncetime_ms
+
+    @property
+    def water_detected(self) -> bool:
+        level = gpio.read(self.pin_number)
+        return (level == gpio.LOW) if self.active_low else (level == gpio.HIGH)
+
+    def watch(self, callback, debounce_us: int = None):
+        """Register callback(pin, level, tick) on both edges of this sensor.
+
+        Debounce defaults to the sensor's configured bouncetime. With
+        pigpiod running the tick comes from the DMA sampler and is
+        microsecond-accurate, so short glitches are neither missed nor
+        mis-timed.
+        """
+        if debounce_us is None:
+            debounce_us = self.bouncetime_ms * 1000
+        self._cb = gpio.add_alert(self.pin_number, callback, debounce_us=debounce_us)
+
+class CoffeeBar:
+    """Keeps the reservoir topped up between the low and high fill sensors.
+
+    Fully edge-driven: the kernel wakes us only on real sensor transitions,
+    so the process sleeps at ~0% CPU instead of spinning on reads.
+    """
+    def __init__(self):
+        self.LOW_FILL_SENSOR = self._sensor("LOW_FILL_SENSOR")
+        self.HIGH_FILL_SENSOR = self._sensor("HIGH_FILL_SENSOR")
+        self.PULSE_PUMP_BTN = self._sensor("PULSE_PUMP_BTN")
+        self.ESPRESSO_PUMP = Device("ESPRESSO_PUMP", ESPRESSO_PUMP_PIN)
+        self._last_edge_ts = {}
+        self.__SETUP__()
+        # Sensors are active-low (wet = LOW): pump on when the low probe
+        # runs dry, off when the water reaches the high probe. Settled
+        # levels derive from each sensor's polarity.
+        low_dry = gpio.HIGH if self.LOW_FILL_SENSOR.active_low else gpio.LOW
+        high_wet = gpio.LOW if self.HIGH_FILL_SENSOR.active_low else gpio.HIGH
+        self.LOW_FILL_SENSOR.watch(
+            self._debounced(low_dry, lambda: self.ESPRESSO_PUMP.set_state(True),
+                            self.LOW_FILL_SENSOR.bouncetime_ms))
+        self.HIGH_FILL_SENSOR.watch(
+            self._debounced(high_wet, lambda: self.ESPRESSO_PUMP.set_state(False),
+                            self.HIGH_FILL_SENSOR.bouncetime_ms))
+        # Manual hold-to-run: pump follows the (active-low) button level.
+        self.PULSE_PUMP_BTN.watch(self._on_pulse_btn)
+
+    @staticmethod
+    def _sensor(name: str) -> Sensor:
+        cfg = PINS[name]
+        return Sensor(name, cfg["pin"],
+                      bouncetime_ms=cfg.get("bouncetime_ms", DEFAULT_BOUNCETIME_MS))
+
+    def _on_pulse_btn(self, _pin, level, _tick):
+        self.ESPRESSO_PUMP.set_state(level == gpio.LOW)
+
+    def _debounced(self, settled_level: int, action, bouncetime_ms: int):
+        """Wrap an edge action so contact bounce cannot cycle the pump relay.
+
+        Acts only on the edge toward settled_level. On top of the kernel
+        debounce, drops edges that arrive within the pin's bounce window
+        of the previous one, then re-reads the pin after the contacts
+        settle and bails out if the level reverted.
+        """
+        def _callback(pin, level, _tick):
+            if level != settled_level:
+                return
+            now = time.monotonic()
+            if now - self._last_edge_ts.get(pin, 0.0) < bouncetime_ms / 1000.0:
+                return
+            self._last_edge_ts[pin] = now
+            time.sleep(0.02)
+            if gpio.read(pin) != settled_level:
+                return
+            action()
+        return _callback
+
+    def __SETUP__(self):
+        # Sensor lines are claimed (with pull-ups) by gpio.add_alert.
+        gpio.setup_out(self.ESPRESSO_PUMP.pin_number, initial=gpio.LOW)
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s",
+                        level=logging.WARNING if "--quiet" in sys.argv else logging.INFO)
+    try:
+        cb = CoffeeBar()
+        if "--poll" in sys.argv:
+            # C polling fallback for kernels without usable edge alerts;
+            # needs the compiled extension (python3 setup.py build_ext --inplace).
+            import coffeebar_loop
+            # The C loop reads through the lgpio handle; when the alerts
+            # went through pigpiod the sensor lines were never claimed
+            # there, so (re)claim them as plain inputs first.
+            for name in ("LOW_FILL_SENSOR", "HIGH_FILL_SENSOR"):
+                gpio.free(PINS[name]["pin"])
+                gpio.setup_in(PINS[name]["pin"], pull=PINS[name]["pull"])
+            logger.info("[INFO] CoffeeBar running (C poll loop). Ctrl-C to stop.")
+            coffeebar_loop.run_loop(gpio.handle(), LOW_FILL_PIN, HIGH_FILL_PIN,
+                                    ESPRESSO_PUMP_PIN)
+        else:
+            logger.info("[INFO] CoffeeBar running (event-driven). Ctrl-C to stop.")
+            # Catch up with the state we booted into, then block until an
+            # edge fires: anywhere below the high mark needs the pump.
+            if not cb.HIGH_FILL_SENSOR.water_detected:
+                cb.ESPRESSO_PUMP.set_state(True)
+            signal.pause()
+    except KeyboardInterrupt:
+        logger.info("\n[INFO] Stopped.")
+    finally:
+        gpio.cleanup()
+        logger.info("[CLEANUP] GPIO reset.")
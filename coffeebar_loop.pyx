@@ -0,0 +1,47 @@
+# cython: language_level=3
+"""Optional C polling fallback for the CoffeeBar control loop.
+
+The normal path in coffeebar.py is purely event-driven and has no
+steady-state loop at all; this extension is for kernels where GPIO edge
+alerts are unavailable. The loop runs without the GIL and without any
+Python bytecode per iteration, calling liblgpio directly. Build with:
+
+    python3 setup.py build_ext --inplace
+"""
+
+from cpython.exc cimport PyErr_CheckSignals
+
+cdef extern from "lgpio.h":
+    int lgGpioRead(int handle, int gpio) nogil
+    int lgGpioWrite(int handle, int gpio, int level) nogil
+
+cdef extern from "unistd.h":
+    int usleep(unsigned int usec) nogil
+
+
+def run_loop(int handle, int low_pin, int high_pin, int pump_pin):
+    """Poll the fill sensors at 1 kHz and drive the pump until interrupted.
+
+    Matches the event-driven logic for active-low sensors (wet = 0): low
+    probe dry -> pump on, high probe wet -> pump off, hold in between.
+    The handle is the backend's open gpiochip.
+    """
+    cdef int low, high
+    while True:
+        with nogil:
+            low = lgGpioRead(handle, low_pin)
+            high = lgGpioRead(handle, high_pin)
+        if low < 0 or high < 0:
+            # Negative means an lgpio error (e.g. line not claimed on this
+            # handle) — carrying on would leave the pump undriven forever.
+            raise OSError(f"lgGpioRead failed (low={low}, high={high}); "
+                          f"are the sensor lines claimed on this handle?")
+        with nogil:
+            if low == 1:
+                lgGpioWrite(handle, pump_pin, 1)
+            elif high == 0:
+                lgGpioWrite(handle, pump_pin, 0)
+            usleep(1000)
+        # Reacquiring the GIL alone never services pending signals; run the
+        # check explicitly so Ctrl-C raises KeyboardInterrupt out of here.
+        PyErr_CheckSignals()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Thin GPIO adapter over lgpio's /dev/gpiochip0 character-device interface.
+
+Replaces the RPi.GPIO sysfs/mmap path: fewer syscalls per read/write and
+kernel-timestamped edge alerts. Pin numbers are BCM, unchanged.
+
+If the pigpio daemon is running, edge alerts come from its DMA sampler
+instead of the kernel interrupt path: 200 kHz sampling at zero CPU cost,
+microsecond-accurate ticks, and no missed sub-50 microsecond pulses. Start it
+once with `sudo pigpiod`; without it we fall back to lgpio alerts.
+"""
+import lgpio
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
+HIGH = 1
+LOW = 0
+
+CHIP = 0
+_handle = None
+_pi = None
+
+_PULL_FLAGS = {
+    "UP":   lgpio.SET_PULL_UP,
+    "DOWN": lgpio.SET_PULL_DOWN,
+    "OFF":  lgpio.SET_PULL_NONE,
+}
+
+def _chip():
+    global _handle
+    if _handle is None:
+        _handle = lgpio.gpiochip_open(CHIP)
+    return _handle
+
+def _pigpio():
+    """Connection to the pigpio daemon, or None if it is not reachable."""
+    global _pi
+    if pigpio is None:
+        return None
+    if _pi is None:
+        pi = pigpio.pi()
+        _pi = pi if pi.connected else False
+    return _pi or None
+
+def handle() -> int:
+    """The open gpiochip handle, for C extensions that poll lgpio directly."""
+    return _chip()
+
+def setup_out(pin: int, initial: int = LOW):
+    lgpio.gpio_claim_output(_chip(), pin, initial)
+
+def setup_in(pin: int, pull: str = "UP"):
+    lgpio.gpio_claim_input(_chip(), pin, _PULL_FLAGS[pull.upper()])
+
+def write(pin: int, level: int):
+    lgpio.gpio_write(_chip(), pin, level)
+
+def read(pin: int) -> int:
+    # With pigpiod active, alert lines are configured through the daemon and
+    # never claimed on the lgpio handle, so reads must go through it too —
+    # lgpio.gpio_read errors on an unclaimed line.
+    pi = _pigpio()
+    if pi is not None:
+        return pi.read(pin)
+    return lgpio.gpio_read(_chip(), pin)
+
+def free(pin: int):
+    """Release a claimed line so another interface (e.g. sysfs) can take it."""
+    try:
+        lgpio.gpio_free(_chip(), pin)
+    except lgpio.error:
+        pass
+
+def write_bank(set_mask: int, clear_mask: int):
+    """Drive many pins at once: raise set_mask bits, drop clear_mask bits.
+
+    With pigpiod running this is one GPSET0 and one GPCLR0 register-wide
+    store for up to 32 pins; without it, falls back to per-pin writes.
+    """
+    pi = _pigpio()
+    if pi is not None:
+        if set_mask:
+            pi.set_bank_1(set_mask)
+        if clear_mask:
+            pi.clear_bank_1(clear_mask)
+        return
+    h = _chip()
+    remaining = set_mask | clear_mask
+    pin = 0
+    while remaining:
+        if remaining & 1:
+            lgpio.gpio_write(h, pin, (set_mask >> pin) & 1)
+        remaining >>= 1
+        pin += 1
+
+def add_alert(pin: int, callback, debounce_us: int = 0, pull: str = "UP"):
+    """Fire callback(pin, level, timestamp) on both edges of pin.
+
+    The timestamp comes from the sampler/kernel event, not from Python.
+    Returns the backend callback object; call .cancel() on it to stop the
+    alerts. Prefers pigpio's DMA sampler when the daemon is running.
+    """
+    pi = _pigpio()
+    if pi is not None:
+        pulls = {"UP": pigpio.PUD_UP, "DOWN": pigpio.PUD_DOWN, "OFF": pigpio.PUD_OFF}
+        pi.set_mode(pin, pigpio.INPUT)
+        pi.set_pull_up_down(pin, pulls[pull.upper()])
+        if debounce_us:
+            pi.set_glitch_filter(pin, debounce_us)
+
+        def _pcb(gpio_num, level, tick):
+            if level == 2:  # watchdog timeout, not a real edge
+                return
+            callback(gpio_num, level, tick)
+
+        return pi.callback(pin, pigpio.EITHER_EDGE, _pcb)
+
+    h = _chip()
+    free(pin)  # re-claim as alert if already claimed as input
+    lgpio.gpio_claim_alert(h, pin, lgpio.BOTH_EDGES, _PULL_FLAGS[pull.upper()])
+    if debounce_us:
+        lgpio.gpio_set_debounce_micros(h, pin, debounce_us)
+
+    def _cb(_chip_id, gpio, level, tick):
+        if level == 2:  # watchdog timeout, not a real edge
+            return
+        callback(gpio, level, tick)
+
+    return lgpio.callback(h, pin, lgpio.BOTH_EDGES, _cb)
+
+def cleanup():
+    global _handle, _pi
+    if _pi:
+        _pi.stop()
+    _pi = None
+    if _handle is not None:
+        lgpio.gpiochip_close(_handle)
+        _handle = None
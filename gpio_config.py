@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Shared pin table and GPIO setup for every coffeebar entry point.
+
+main.py and test.py used to carry their own PINS and _setup_gpio copies,
+and the two had drifted (different pull handling on the fill sensor).
+This module is now the single source of truth; pull is explicit for
+every INPUT pin so nothing depends on a per-file default.
+"""
+from typing import Any, Dict
+import gpio_backend as gpio
+
+# ---------------- Pin configuration (BCM) ----------------
+PINS: Dict[str, Dict[str, Any]] = {
+    "LOW_FILL_SENSOR":     {"pin": 18, "dir": "IN",  "pull": "UP", "active_low": True, "bouncetime_ms": 50},
+    "HIGH_FILL_SENSOR":    {"pin": 24, "dir": "IN",  "pull": "UP", "active_low": True, "bouncetime_ms": 50},
+    "PULSE_PUMP_BTN":      {"pin": 25, "dir": "IN",  "pull": "UP", "active_low": True, "bouncetime_ms": 50},
+    "ESPRESSO_PUMP_RELAY": {"pin": 23, "dir": "OUT", "active_high": True},
+}
+# ---------------------------------------------------------
+
+def setup(pins: Dict[str, Dict[str, Any]] = PINS):
+    """Claim every configured pin and cache normalized per-pin fields.
+
+    Stamps each entry with _is_out / _on_level / _off_level so toggle
+    paths are a plain dict lookup instead of re-running .upper()/.get()
+    on every write.
+    """
+    for name, cfg in pins.items():
+        pin = cfg["pin"]
+        cfg["_is_out"] = cfg["dir"].upper() == "OUT"
+        if cfg["_is_out"]:
+            active_high = bool(cfg.get("active_high", True))
+            cfg["_on_level"] = gpio.HIGH if active_high else gpio.LOW
+            cfg["_off_level"] = gpio.LOW if active_high else gpio.HIGH
+            gpio.setup_out(pin, initial=gpio.LOW)
+        else:
+            gpio.setup_in(pin, pull=cfg["pull"])
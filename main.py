@@ -1,44 +1,89 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import functools
+import logging
+import os
+import select
+import signal
+import threading
 import time
-import sys
-from typing import Dict, Any
-import RPi.GPIO as GPIO
+from array import array
+from typing import Dict
+import gpio_backend as gpio
+from gpio_config import PINS, setup
 
-# ---------------- Pin configuration ----------------
-PINS: Dict[str, Dict[str, Any]] = {
-    "LOW_FILL_SENSOR":     {"pin": 18, "dir": "IN",  "pull": "UP",  "active_low": True},
-    "ESPRESSO_PUMP_RELAY": {"pin": 23, "dir": "OUT", "active_high": True},
-}
-# ---------------------------------------------------
+logger = logging.getLogger(__name__)
 
 DEFAULT_DELAY = 1.0
 DEFAULT_DEBOUNCE_MS = 200
 
-def _setup_gpio():
-    GPIO.setmode(GPIO.BCM)
-    for name, cfg in PINS.items():
-        pin = cfg["pin"]
-        if cfg["dir"].upper() == "OUT":
-            GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+_ON_TOKENS = frozenset({"on", "high", "1", "true"})
+_OFF_TOKENS = frozenset({"off", "low", "0", "false"})
+
+# Set from the SIGTERM handler; loops wait on this instead of time.sleep
+# so a shutdown request cuts the delay short instead of riding it out.
+_stop = threading.Event()
+
+# Structure-of-arrays view of PINS: hot loops index three cache-adjacent
+# scalars per pin instead of chasing a per-pin dict on every toggle.
+PIN_NAMES: list = []
+PIN_NUMBERS = array("i")
+PIN_IS_OUT = bytearray()
+PIN_ON_LEVEL = bytearray()
+PIN_OFF_LEVEL = bytearray()
+# Per-pin zero-arg toggles with the pin number and level already bound in,
+# so a hot-loop toggle is one call with no lookup or level computation.
+PIN_ON_FN: list = []
+PIN_OFF_FN: list = []
+NAME_INDEX: Dict[str, int] = {}
+OUT_INDICES: tuple = ()
+# (set_mask, clear_mask) pairs driving every output ON or OFF in one
+# bank write; active-low pins land in the opposite mask.
+OUT_ON_MASKS: tuple = (0, 0)
+OUT_OFF_MASKS: tuple = (0, 0)
+
+def _compile_pins():
+    global OUT_INDICES, OUT_ON_MASKS, OUT_OFF_MASKS
+    del PIN_NAMES[:]
+    del PIN_NUMBERS[:]
+    PIN_IS_OUT.clear()
+    PIN_ON_LEVEL.clear()
+    PIN_OFF_LEVEL.clear()
+    del PIN_ON_FN[:]
+    del PIN_OFF_FN[:]
+    NAME_INDEX.clear()
+    for i, (name, cfg) in enumerate(PINS.items()):
+        NAME_INDEX[name] = i
+        PIN_NAMES.append(name)
+        PIN_NUMBERS.append(cfg["pin"])
+        PIN_IS_OUT.append(1 if cfg["dir"].upper() == "OUT" else 0)
+        active_high = bool(cfg.get("active_high", True))
+        PIN_ON_LEVEL.append(gpio.HIGH if active_high else gpio.LOW)
+        PIN_OFF_LEVEL.append(gpio.LOW if active_high else gpio.HIGH)
+        PIN_ON_FN.append(functools.partial(gpio.write, cfg["pin"], PIN_ON_LEVEL[i]))
+        PIN_OFF_FN.append(functools.partial(gpio.write, cfg["pin"], PIN_OFF_LEVEL[i]))
+    OUT_INDICES = tuple(i for i in range(len(PIN_NUMBERS)) if PIN_IS_OUT[i])
+    on_set = on_clear = 0
+    for i in OUT_INDICES:
+        bit = 1 << PIN_NUMBERS[i]
+        if PIN_ON_LEVEL[i] == gpio.HIGH:
+            on_set |= bit
         else:
-            pull = cfg.get("pull", "UP").upper()
-            if pull == "UP":
-                pud = GPIO.PUD_UP
-            elif pull == "DOWN":
-                pud = GPIO.PUD_DOWN
-            else:
-                pud = GPIO.PUD_OFF
-            GPIO.setup(pin, GPIO.IN, pull_up_down=pud)
+            on_clear |= bit
+    OUT_ON_MASKS = (on_set, on_clear)
+    OUT_OFF_MASKS = (on_clear, on_set)
+
+_compile_pins()
 
 def _level_for_on(cfg, on: bool):
-    if cfg["dir"].upper() != "OUT":
+    """Thin wrapper over the levels cached by gpio_config.setup, for external callers."""
+    if not cfg["_is_out"]:
         raise ValueError("Tried to drive an input pin.")
-    active_high = bool(cfg.get("active_high", True))
-    return GPIO.HIGH if (on == active_high) else GPIO.LOW
+    return cfg["_on_level"] if on else cfg["_off_level"]
 
 def list_pins():
-    print("[INFO] Available pins:")
+    logger.info("[INFO] Available pins:")
     for name, cfg in PINS.items():
         row = f"- {name}: GPIO {cfg['pin']} [{cfg['dir']}"
         if cfg["dir"].upper() == "IN":
@@ -48,114 +93,221 @@ def list_pins():
         else:
             row += f", active_high={cfg.get('active_high', True)}"
         row += "]"
-        print(row)
+        logger.info(row)
 
 def cycle_all(delay: float):
-    outs = [(n, c) for n, c in PINS.items() if c["dir"].upper() == "OUT"]
-    if not outs:
-        print("[WARN] No OUTPUT pins configured to cycle.")
+    if not OUT_INDICES:
+        logger.warning("[WARN] No OUTPUT pins configured to cycle.")
         return
-    print("[INFO] Cycling outputs:", ", ".join(f"{n}(GPIO {c['pin']})" for n, c in outs))
+    names = ", ".join(f"{PIN_NAMES[i]}(GPIO {PIN_NUMBERS[i]})" for i in OUT_INDICES)
+    logger.info("[INFO] Cycling outputs: %s", names)
+    on_set, on_clear = OUT_ON_MASKS
+    off_set, off_clear = OUT_OFF_MASKS
+    # Bind hot globals to locals: saves a LOAD_GLOBAL per use in the loop.
+    _write_bank = gpio.write_bank
+    _wait = _stop.wait
     try:
-        while True:
-            for name, cfg in outs:
-                pin = cfg["pin"]
-                print(f"[STATE] {name} (GPIO {pin}) -> ON")
-                GPIO.output(pin, _level_for_on(cfg, True))
-                time.sleep(delay)
-                print(f"[STATE] {name} (GPIO {pin}) -> OFF")
-                GPIO.output(pin, _level_for_on(cfg, False))
-                time.sleep(delay)
+        while not _stop.is_set():
+            # One bank write toggles every output together instead of a
+            # write call per pin.
+            logger.info("[STATE] %s -> ON", names)
+            _write_bank(on_set, on_clear)
+            if _wait(delay):
+                break
+            logger.info("[STATE] %s -> OFF", names)
+            _write_bank(off_set, off_clear)
+            if _wait(delay):
+                break
     except KeyboardInterrupt:
-        print("\n[INFO] Stopped.")
-    finally:
-        GPIO.cleanup()
-        print("[CLEANUP] GPIO reset.")
+        logger.info("\n[INFO] Stopped.")
 
 def test_pin_output(pin_name: str, cycles: int, delay: float):
-    if pin_name not in PINS:
-        print(f"[ERROR] Unknown pin '{pin_name}'. Use --list to see options.")
+    idx = NAME_INDEX.get(pin_name)
+    if idx is None:
+        logger.error(f"[ERROR] Unknown pin '{pin_name}'. Use --list to see options.")
         return
-    cfg = PINS[pin_name]
-    if cfg["dir"].upper() != "OUT":
-        print(f"[ERROR] {pin_name} is INPUT. Use 'watch' for inputs.")
+    if not PIN_IS_OUT[idx]:
+        logger.error(f"[ERROR] {pin_name} is INPUT. Use 'watch' for inputs.")
         return
-    pin = cfg["pin"]
+    pin = PIN_NUMBERS[idx]
+    on_fn, off_fn = PIN_ON_FN[idx], PIN_OFF_FN[idx]
+    _wait = _stop.wait
     try:
-        print(f"[INFO] Testing OUTPUT {pin_name} (GPIO {pin}) for {cycles} cycles...")
+        logger.info(f"[INFO] Testing OUTPUT {pin_name} (GPIO {pin}) for {cycles} cycles...")
         for i in range(1, cycles + 1):
-            print(f"[CYCLE {i}] {pin_name} -> ON")
-            GPIO.output(pin, _level_for_on(cfg, True))
-            time.sleep(delay)
-            print(f"[CYCLE {i}] {pin_name} -> OFF")
-            GPIO.output(pin, _level_for_on(cfg, False))
-            time.sleep(delay)
-        print(f"[INFO] Completed testing {pin_name}.")
+            logger.info("[CYCLE %d] %s -> ON", i, pin_name)
+            on_fn()
+            if _wait(delay):
+                break
+            logger.info("[CYCLE %d] %s -> OFF", i, pin_name)
+            off_fn()
+            if _wait(delay):
+                break
+        if not _stop.is_set():
+            logger.info(f"[INFO] Completed testing {pin_name}.")
     except KeyboardInterrupt:
-        print("\n[INFO] Interrupted.")
-    finally:
-        GPIO.cleanup()
-        print("[CLEANUP] GPIO reset.")
+        logger.info("\n[INFO] Interrupted.")
 
-def set_output(pin_name: str, state: str):
-    if pin_name not in PINS:
-        print(f"[ERROR] Unknown pin '{pin_name}'. Use --list to see options.")
+def set_output(pin_name: str, state: str, verify: bool = False, reset: bool = False):
+    idx = NAME_INDEX.get(pin_name)
+    if idx is None:
+        logger.error(f"[ERROR] Unknown pin '{pin_name}'. Use --list to see options.")
         return
-    cfg = PINS[pin_name]
-    if cfg["dir"].upper() != "OUT":
-        print(f"[ERROR] {pin_name} is INPUT. Cannot set an input.")
+    if not PIN_IS_OUT[idx]:
+        logger.error(f"[ERROR] {pin_name} is INPUT. Cannot set an input.")
         return
-    pin = cfg["pin"]
+    pin = PIN_NUMBERS[idx]
     state_norm = state.strip().lower()
-    logical_on = state_norm in ("on", "high", "1", "true")
-    try:
-        GPIO.output(pin, _level_for_on(cfg, logical_on))
-        phys = "HIGH" if GPIO.input(pin) == GPIO.HIGH else "LOW"
-        print(f"[INFO] {pin_name} (GPIO {pin}) set to {'ON' if logical_on else 'OFF'} (physical {phys})")
-    finally:
-        GPIO.cleanup()
-        print("[CLEANUP] GPIO reset.")
+    if state_norm in _ON_TOKENS:
+        logical_on = True
+    elif state_norm in _OFF_TOKENS:
+        logical_on = False
+    else:
+        logger.error(f"[ERROR] Unknown state '{state}'. Use on|off|high|low|1|0|true|false.")
+        return
+    (PIN_ON_FN[idx] if logical_on else PIN_OFF_FN[idx])()
+    if verify:
+        # Purely diagnostic read-back; costs a second syscall, so it
+        # is opt-in.
+        phys = "HIGH" if gpio.read(pin) == gpio.HIGH else "LOW"
+        logger.info(f"[INFO] {pin_name} (GPIO {pin}) set to {'ON' if logical_on else 'OFF'} (physical {phys})")
+    else:
+        logger.info(f"[INFO] {pin_name} (GPIO {pin}) set to {'ON' if logical_on else 'OFF'}")
+    # The pin keeps driving the requested level after we exit; --reset
+    # restores the old release-on-exit behavior.
+    if reset:
+        gpio.cleanup()
+        logger.info("[CLEANUP] GPIO reset.")
 
 def _fmt_input(name: str, level: int):
     active_low = bool(PINS[name].get("active_low", False))
-    logical = "ACTIVE" if (level == GPIO.LOW and active_low) or (level == GPIO.HIGH and not active_low) else "INACTIVE"
-    return f"{name} = {'LOW' if level == GPIO.LOW else 'HIGH'} ({logical})"
+    logical = "ACTIVE" if (level == gpio.LOW and active_low) or (level == gpio.HIGH and not active_low) else "INACTIVE"
+    return f"{name} = {'LOW' if level == gpio.LOW else 'HIGH'} ({logical})"
+
+_SYSFS_GPIO = "/sys/class/gpio"
+
+def _watch_sysfs_epoll(pin_name: str, pin: int, duration: float, bouncetime_ms: int) -> bool:
+    """Edge-wait via epoll on the sysfs GPIO value file.
+
+    Blocks in the kernel and wakes only on real edges (EPOLLPRI), instead
+    of re-reading the pin every 500 ms. The caller must release any
+    character-device claim on the line first, or the export fails.
+    Returns False when the sysfs GPIO interface is unavailable (newer
+    kernels) or the line is busy, so the caller can fall back to backend
+    alerts.
+    """
+    gpio_dir = f"{_SYSFS_GPIO}/gpio{pin}"
+    try:
+        if not os.path.isdir(gpio_dir):
+            with open(f"{_SYSFS_GPIO}/export", "w") as f:
+                f.write(str(pin))
+        with open(f"{gpio_dir}/edge", "w") as f:
+            f.write("both")
+        fd = os.open(f"{gpio_dir}/value", os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return False
+    ep = select.epoll()
+    try:
+        ep.register(fd, select.EPOLLPRI | select.EPOLLERR)
+        # The first wakeup reports the current level, not an edge; drain it.
+        os.pread(fd, 2, 0)
 
-def watch_input(pin_name: str, duration: float, bouncetime_ms: int):
+        def _read_level():
+            return gpio.HIGH if os.pread(fd, 2, 0).strip() == b"1" else gpio.LOW
+
+        last_edge_ts = 0.0
+        t_end = time.monotonic() + duration
+        while (remaining := t_end - time.monotonic()) > 0:
+            for _fd, _ev in ep.poll(remaining):
+                # Drain the fd before any guard: POLLPRI stays asserted
+                # until the attribute is re-read, so skipping the read
+                # would make ep.poll return immediately and busy-spin for
+                # the rest of the bounce window.
+                val = _read_level()
+                # Same software debounce as the alert path: bounce window,
+                # then a settle re-read that drops reverted edges.
+                now = time.monotonic()
+                if now - last_edge_ts < bouncetime_ms / 1000.0:
+                    continue
+                last_edge_ts = now
+                time.sleep(0.02)
+                if _read_level() != val:
+                    continue
+                edge = "RISING" if val == gpio.HIGH else "FALLING"
+                logger.info(f"[EDGE] {pin_name} (GPIO {pin}) {edge} -> {_fmt_input(pin_name, val)}")
+        logger.info("[INFO] Done watching input.")
+        return True
+    finally:
+        ep.close()
+        os.close(fd)
+        try:
+            # Reset edge to none before unexporting so a later export
+            # re-arms cleanly.
+            with open(f"{gpio_dir}/edge", "w") as f:
+                f.write("none")
+            with open(f"{_SYSFS_GPIO}/unexport", "w") as f:
+                f.write(str(pin))
+        except OSError:
+            pass
+
+def watch_input(pin_name: str, duration: float, bouncetime_ms: int = None):
     if pin_name not in PINS:
-        print(f"[ERROR] Unknown pin '{pin_name}'. Use --list to see options.")
+        logger.error(f"[ERROR] Unknown pin '{pin_name}'. Use --list to see options.")
         return
     cfg = PINS[pin_name]
-    if cfg["dir"].upper() != "IN":
-        print(f"[ERROR] {pin_name} is OUTPUT. Use 'test' or 'set' for outputs.")
+    if cfg["_is_out"]:
+        logger.error(f"[ERROR] {pin_name} is OUTPUT. Use 'test' or 'set' for outputs.")
         return
     pin = cfg["pin"]
+    # An explicit --debounce wins; otherwise fall back to the pin config,
+    # then the module default.
+    if bouncetime_ms is None:
+        bouncetime_ms = cfg.get("bouncetime_ms", DEFAULT_DEBOUNCE_MS)
+    last_edge_ts = {pin: 0.0}
 
-    def _callback(_pin):
-        val = GPIO.input(pin)
-        edge = "RISING" if val == GPIO.HIGH else "FALLING"
-        print(f"[EDGE] {pin_name} (GPIO {pin}) {edge} -> {_fmt_input(pin_name, val)}")
+    def _callback(_pin, val, _tick):
+        # Second guard on top of the kernel debounce: reject edges that
+        # arrive within the bounce window, then re-read after the contacts
+        # settle and drop the event if the level reverted.
+        now = time.monotonic()
+        if now - last_edge_ts[pin] < bouncetime_ms / 1000.0:
+            return
+        last_edge_ts[pin] = now
+        time.sleep(0.02)
+        if gpio.read(pin) != val:
+            return
+        edge = "RISING" if val == gpio.HIGH else "FALLING"
+        logger.info(f"[EDGE] {pin_name} (GPIO {pin}) {edge} -> {_fmt_input(pin_name, val)}")
 
-    print(f"[INFO] Watching INPUT {pin_name} (GPIO {pin}) for {duration:.1f}s (debounce={bouncetime_ms}ms)")
+    logger.info(f"[INFO] Watching INPUT {pin_name} (GPIO {pin}) for {duration:.1f}s (debounce={bouncetime_ms}ms)")
     try:
-        s0 = GPIO.input(pin)
-        print(f"[STATE] Initial: {_fmt_input(pin_name, s0)}")
-        GPIO.add_event_detect(pin, GPIO.BOTH, callback=_callback, bouncetime=bouncetime_ms)
-        t_end = time.time() + duration
-        while time.time() < t_end:
-            now = GPIO.input(pin)
-            print(f"[STATE] {_fmt_input(pin_name, now)}")
-            time.sleep(0.5)
-        print("[INFO] Done watching input.")
+        s0 = gpio.read(pin)
+        logger.info(f"[STATE] Initial: {_fmt_input(pin_name, s0)}")
+        # sysfs cannot export a line that is claimed on the character
+        # device, so release our claim while we try it; add_alert
+        # re-claims for the fallback.
+        gpio.free(pin)
+        if _watch_sysfs_epoll(pin_name, pin, duration, bouncetime_ms):
+            return
+        gpio.add_alert(pin, _callback, debounce_us=bouncetime_ms * 1000,
+                       pull=cfg.get("pull", "UP"))
+        # Edges print from the alert callback; block until the monotonic
+        # deadline (or SIGTERM) instead of waking every 500 ms to re-print
+        # unchanged state.
+        _wait = _stop.wait
+        _mono = time.monotonic
+        t_end = _mono() + duration
+        while (remaining := t_end - _mono()) > 0:
+            if _wait(remaining):
+                break
+        logger.info("[INFO] Done watching input.")
     except KeyboardInterrupt:
-        print("\n[INFO] Interrupted.")
-    finally:
-        GPIO.cleanup()
-        print("[CLEANUP] GPIO reset.")
+        logger.info("\n[INFO] Interrupted.")
 
 def main():
     parser = argparse.ArgumentParser(description="GPIO dynamic tester (inputs & outputs)")
     parser.add_argument("--list", action="store_true", help="List configured pins and exit")
+    parser.add_argument("--quiet", action="store_true", help="Suppress status output (warnings/errors only)")
     sub = parser.add_subparsers(dest="cmd", required=False)
 
     p_cycle = sub.add_parser("cycle", help="Cycle all OUTPUT pins on/off continuously")
@@ -169,19 +321,35 @@ def main():
     p_watch = sub.add_parser("watch", help="Watch a single INPUT pin for edges")
     p_watch.add_argument("pin", type=str, help="Pin name (key in PINS)")
     p_watch.add_argument("--duration", type=float, default=20.0, help="Watch time in seconds")
-    p_watch.add_argument("--debounce", type=int, default=DEFAULT_DEBOUNCE_MS, help="Debounce in ms")
+    p_watch.add_argument("--debounce", type=int, default=None,
+                         help=f"Debounce in ms (default: pin config, else {DEFAULT_DEBOUNCE_MS})")
 
     p_set = sub.add_parser("set", help="Manually set an OUTPUT pin to on/off")
     p_set.add_argument("pin", type=str, help="Pin name (key in PINS)")
     p_set.add_argument("state", type=str, help="on|off|high|low|1|0|true|false")
+    p_set.add_argument("--verify", action="store_true", help="Read the pin back and report the physical level")
+    p_set.add_argument("--reset", action="store_true", help="Release the pin on exit instead of holding the state")
 
     args = parser.parse_args()
 
+    # Status messages go through logging so tight cycle loops can drop the
+    # ~50us-per-print tty cost with --quiet instead of editing code.
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    signal.signal(signal.SIGTERM, lambda *a: _stop.set())
+
+    # 'set' deliberately holds its state after exit; everything else
+    # releases the chip on the way out.
+    if args.cmd in ("cycle", "test", "watch"):
+        atexit.register(gpio.cleanup)
+
     if args.__dict__.get("list"):
         list_pins()
         return
 
-    _setup_gpio()
+    setup()
 
     if args.cmd == "cycle":
         cycle_all(delay=args.delay)
@@ -190,19 +358,19 @@ def main():
     elif args.cmd == "watch":
         watch_input(args.pin, duration=args.duration, bouncetime_ms=args.debounce)
     elif args.cmd == "set":
-        set_output(args.pin, args.state)
+        set_output(args.pin, args.state, verify=args.verify, reset=args.reset)
     else:
         list_pins()
-        print("\n[HINT] Examples:")
-        print("  sudo python3 gpio_tester.py cycle --delay 0.5")
-        print("  sudo python3 gpio_tester.py test ESPRESSO_PUMP_RELAY --cycles 5")
-        print("  sudo python3 gpio_tester.py watch LOW_FILL_SENSOR --duration 30")
-        print("  sudo python3 gpio_tester.py set ESPRESSO_PUMP_RELAY on")
+        logger.info("\n[HINT] Examples:")
+        logger.info("  sudo python3 gpio_tester.py cycle --delay 0.5")
+        logger.info("  sudo python3 gpio_tester.py test ESPRESSO_PUMP_RELAY --cycles 5")
+        logger.info("  sudo python3 gpio_tester.py watch LOW_FILL_SENSOR --duration 30")
+        logger.info("  sudo python3 gpio_tester.py set ESPRESSO_PUMP_RELAY on")
 
 if __name__ == "__main__":
     try:
         main()
     except Exception:
-        GPIO.cleanup()
-        print("[CLEANUP] GPIO reset due to exception.", file=sys.stderr)
+        gpio.cleanup()
+        logger.error("[CLEANUP] GPIO reset due to exception.")
         raise
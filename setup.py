@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+# Only needed for the optional C polling fallback; the event-driven path
+# in coffeebar.py runs without building anything.
+setup(
+    name="coffeebar",
+    ext_modules=cythonize([
+        Extension("coffeebar_loop", ["coffeebar_loop.pyx"], libraries=["lgpio"]),
+    ]),
+)